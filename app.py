@@ -3,9 +3,50 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import base64
+import hashlib
+import io
 
-def cashless_reimbursement_table(data_df):
-    """Calculates and displays the Cashless vs Reimbursement table."""
+from shared_cache import SharedReportCache
+
+# Cached frames are shared between sessions; with copy-on-write, writes through a
+# session's copy never reach the shared data.
+pd.options.mode.copy_on_write = True
+
+
+@st.cache_resource
+def get_shared_cache():
+    """Returns the cache instance shared by all sessions of this server process."""
+    return SharedReportCache()
+
+
+def load_claims_data(uploaded_file):
+    """Parses the uploaded CSV once per distinct file and returns (data_df, file_hash)."""
+    raw = uploaded_file.getvalue()
+    file_hash = hashlib.sha256(raw).hexdigest()
+    shared_df = get_shared_cache().get_or_compute(
+        (file_hash, "claims_data"), lambda: pd.read_csv(io.BytesIO(raw)))
+    # Each session gets its own frame object, so column assignments stay local;
+    # copy-on-write defers copying the data until the session actually writes.
+    return shared_df.copy(deep=False), file_hash
+
+
+def get_report_table(file_hash, report_name, compute_fn, data_df):
+    """Returns the breakup table for this file from the shared cache, computing it on a miss."""
+    return get_shared_cache().get_or_compute((file_hash, report_name), lambda: compute_fn(data_df))
+
+
+def show_cache_stats():
+    """Displays the shared cache metrics in the sidebar."""
+    stats = get_shared_cache().stats()
+    st.sidebar.subheader("Shared Cache")
+    st.sidebar.write(
+        f"Entries: {stats['entries']}  "
+        f"Memory: {stats['bytes'] / 2**20:,.0f}/{stats['max_bytes'] / 2**20:,.0f} MB  \n"
+        f"Hits: {stats['hits']}  Misses: {stats['misses']}  \n"
+        f"Hit rate: {stats['hit_rate']:.0%}  Evictions: {stats['evictions']}")
+
+def compute_cashless_reimbursement(data_df):
+    """Builds the Cashless vs Reimbursement summary table."""
     cashless_df=data_df.copy()
 
     claim_amt_summary = cashless_df.groupby("Claim_Type")["Claimed_Amount"].sum().reset_index()
@@ -41,6 +82,13 @@ def cashless_reimbursement_table(data_df):
 
     final_summary = final_summary.rename(columns={"Claim_Type": "Claim Mode"})
 
+    return final_summary
+
+
+def cashless_reimbursement_table(data_df, file_hash):
+    """Calculates and displays the Cashless vs Reimbursement table."""
+    final_summary = get_report_table(file_hash, "cashless_reimbursement", compute_cashless_reimbursement, data_df)
+
     st.table(final_summary.style.format({"Claimed_Amount": "{:,.0f}", 
                                          "As a % total Amt.": "{:.0f}%",
                                          "As a % of total No.": "{:.0f}%",# 
@@ -85,8 +133,8 @@ def cashless_reimbursement_charts(final_summary):
 
 
 
-def relationship_wise_claims(data_df):
-    """Calculates and displays the Relationship-wise Settled & Underprocess Claims Break Up table."""
+def compute_relationship_wise_claims(data_df):
+    """Builds the Relationship-wise Settled & Underprocess Claims Break Up table."""
 
     
     relationship_mapping = {
@@ -97,6 +145,7 @@ def relationship_wise_claims(data_df):
         'Mother': 'Parents',
         'Father': 'Parents'
     }
+    data_df = data_df.copy()
     data_df["Relation"] = data_df["Relation"].map(relationship_mapping)
 
     claim_amt_summary = data_df.groupby("Relation")["Incurred_Amount"].sum().reset_index()
@@ -124,6 +173,13 @@ def relationship_wise_claims(data_df):
 
     final_summary1 = pd.concat([final_summary1, total_row], ignore_index=True)
 
+    return final_summary1
+
+
+def relationship_wise_claims(data_df, file_hash):
+    """Calculates and displays the Relationship-wise Settled & Underprocess Claims Break Up table."""
+    final_summary1 = get_report_table(file_hash, "relationship_wise", compute_relationship_wise_claims, data_df)
+
     st.table(final_summary1.style.format({"Claim Amt": "{:,.0f}", 
                                          "As a % total Amt.": "{:.0f}%",
                                          "As a % of total No.s":"{:.0f}%",
@@ -162,8 +218,8 @@ def relationship_wise_charts(final_summary1):
 
 
 
-def age_wise_claims_breakup(data_df):
-    """Calculates and displays the Age-wise Claims Break Up table."""
+def compute_age_wise_claims(data_df):
+    """Builds the Age-wise Claims Break Up table."""
     age_data = data_df.copy()
     age_bins = [0, 19, 26, 36, 46, 56, 66, 71, 76, 81, float('inf')]
     age_labels = ['0-18', '19-25', '26-35', '36-45', '46-55', '56-65', '66-70', '71-75', '76-80', 'Above 80']
@@ -199,7 +255,13 @@ def age_wise_claims_breakup(data_df):
 
     age_table = pd.concat([age_table, grand_total_row], ignore_index=True)
 
-    
+    return age_table
+
+
+def age_wise_claims_breakup(data_df, file_hash):
+    """Calculates and displays the Age-wise Claims Break Up table."""
+    age_table = get_report_table(file_hash, "age_wise", compute_age_wise_claims, data_df)
+
     st.table(age_table.style.format({"Claim_Amt": "{:,.0f}", "Avg Claim Size": "{:,.0f}"}))
 
     return age_table
@@ -236,8 +298,8 @@ def plot_age_wise_claims(age_table):
     
 
 
-def amount_band_wise_claims_breakup(data_df):
-    """Calculates and displays the Amount Band Wise Claims Break Up table."""
+def compute_amount_band_wise_claims(data_df):
+    """Builds the Amount Band Wise Claims Break Up table."""
     data = data_df.copy()
 
     amount_bins = [0, 1, 25001, 50001, 75001, 100001, 150001, 200001, 300001, float('inf')]
@@ -271,6 +333,13 @@ def amount_band_wise_claims_breakup(data_df):
 
     amount_band_data = pd.concat([amount_band_data, grand_total_row], ignore_index=True)
 
+    return amount_band_data
+
+
+def amount_band_wise_claims_breakup(data_df, file_hash):
+    """Calculates and displays the Amount Band Wise Claims Break Up table."""
+    amount_band_data = get_report_table(file_hash, "amount_band_wise", compute_amount_band_wise_claims, data_df)
+
     st.write(amount_band_data.style.format({"Claim_Amt": "{:,.0f}", "Avg Claim Size": "{:,.0f}"}))
     return amount_band_data
 
@@ -305,8 +374,8 @@ def plot_amount_band_charts(amount_band_data):
 
 
 
-def day_stay_wise_claims_breakup(data_df):
-    """Calculates and displays the No of Day Stay wise Claims Break Up table."""
+def compute_day_stay_wise_claims(data_df):
+    """Builds the No of Day Stay wise Claims Break Up table."""
     data = data_df.copy()
     data["Date_of_Discharge"] = pd.to_datetime(data["Date_of_Discharge"])
     data["Date_of_Admission"] = pd.to_datetime(data["Date_of_Admission"])
@@ -357,7 +426,13 @@ def day_stay_wise_claims_breakup(data_df):
 
     day_stay_data = pd.concat([day_stay_data, grand_total_row], ignore_index=True)
 
-    
+    return day_stay_data
+
+
+def day_stay_wise_claims_breakup(data_df, file_hash):
+    """Calculates and displays the No of Day Stay wise Claims Break Up table."""
+    day_stay_data = get_report_table(file_hash, "day_stay_wise", compute_day_stay_wise_claims, data_df)
+
     st.table(day_stay_data.style.format({"Claim_Amt": "{:,.0f}", "Avg Claim Size": "{:,.0f}"}))
 
     return day_stay_data
@@ -404,8 +479,8 @@ def plot_day_stay_charts(day_stay_data):
 
 
 
-def top_10_city_wise_claims(data_df):
-    """Calculates and displays the Top 10 City-wise Claims Analysis table."""
+def compute_top_10_city_wise_claims(data_df):
+    """Builds the Top 10 City-wise Claims Analysis table."""
     data = data_df.copy()
 
     
@@ -454,7 +529,13 @@ def top_10_city_wise_claims(data_df):
 
     city_data = pd.concat([city_data, grand_total_row], ignore_index=True)
 
-    
+    return city_data
+
+
+def top_10_city_wise_claims(data_df, file_hash):
+    """Calculates and displays the Top 10 City-wise Claims Analysis table."""
+    city_data = get_report_table(file_hash, "top_10_city_wise", compute_top_10_city_wise_claims, data_df)
+
     st.table(city_data.style.format({"Claim_Amt": "{:,.0f}", "Avg Claim Size": "{:,.0f}"}))
 
     return city_data
@@ -491,8 +572,8 @@ def plot_city_wise_charts(city_data):
 
 
 
-def top_10_hospitals_utilization(data_df):
-    """Calculates and displays the Top 10 Hospitals Utilization table."""
+def compute_top_10_hospitals_utilization(data_df):
+    """Builds the Top 10 Hospitals Utilization table."""
     data = data_df.copy()
 
 
@@ -540,7 +621,13 @@ def top_10_hospitals_utilization(data_df):
 
     hospital_data = pd.concat([hospital_data, grand_total_row], ignore_index=True)
 
-    
+    return hospital_data
+
+
+def top_10_hospitals_utilization(data_df, file_hash):
+    """Calculates and displays the Top 10 Hospitals Utilization table."""
+    hospital_data = get_report_table(file_hash, "top_10_hospitals", compute_top_10_hospitals_utilization, data_df)
+
     st.table(hospital_data.style.format({"Claim_Amt": "{:,.0f}", "Avg Claim Size": "{:,.0f}"}))
 
     return hospital_data
@@ -616,37 +703,39 @@ def main():
     uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
 
     if uploaded_file is not None:
-        data_df = pd.read_csv(uploaded_file)
+        data_df, file_hash = load_claims_data(uploaded_file)
         #st.subheader("Insurance Report Generator")
         #st.subheader("Original DataFrame")
         #st.write(data_df)
         st.title("Cashless vs Reimbursement Analysis")
         
-        final_summary = cashless_reimbursement_table(data_df)
+        final_summary = cashless_reimbursement_table(data_df, file_hash)
         cashless_reimbursement_charts(final_summary)
         st.title("Claim Status Report")
         st.title("Relationship Wise Settled & Underprocess Claims Break Up")
 
-        final_summary1 = relationship_wise_claims(data_df)
+        final_summary1 = relationship_wise_claims(data_df, file_hash)
         st.title("Charts")
         relationship_wise_charts(final_summary1)
         st.title("Age-wise Claims Break Up")
-        age_table=age_wise_claims_breakup(data_df)
+        age_table=age_wise_claims_breakup(data_df, file_hash)
         plot_age_wise_claims(age_table)
         st.title("Amount Bandwise Claims Breakup")
-        amount_band_data=amount_band_wise_claims_breakup(data_df)
+        amount_band_data=amount_band_wise_claims_breakup(data_df, file_hash)
         plot_amount_band_charts(amount_band_data)
         
         st.title("Stay wise claims breakup")
-        day_stay_data=day_stay_wise_claims_breakup(data_df)
+        day_stay_data=day_stay_wise_claims_breakup(data_df, file_hash)
         plot_day_stay_charts(day_stay_data)
         st.title("Hospital Wise Claims Analysis")
-        hospital_data=top_10_hospitals_utilization(data_df)
+        hospital_data=top_10_hospitals_utilization(data_df, file_hash)
         plot_hospital_wise_charts(hospital_data)
         
         st.title("City Wise Claims Data")
-        city_data = top_10_city_wise_claims(data_df)
+        city_data = top_10_city_wise_claims(data_df, file_hash)
         plot_city_wise_charts(city_data)
+
+        show_cache_stats()
         
 if __name__ == "__main__":
     main()
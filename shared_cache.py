@@ -0,0 +1,117 @@
+"""Process-wide cache shared by all Streamlit sessions of the report generator."""
+
+import sys
+import threading
+from collections import OrderedDict
+
+SHARED_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+def estimate_size(value):
+    """Approximates the memory held by a cached value, in bytes."""
+    memory_usage = getattr(value, "memory_usage", None)
+    if memory_usage is None:
+        return sys.getsizeof(value)
+    usage = memory_usage(deep=True)
+    return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+
+
+class _PendingResult:
+    """Outcome of an in-flight computation, published to the sessions waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SharedReportCache:
+    """Thread-safe LRU store for claim frames and breakup tables, bounded by estimated memory."""
+
+    def __init__(self, max_bytes=SHARED_CACHE_MAX_BYTES, size_fn=estimate_size):
+        self.max_bytes = max_bytes
+        self.size_fn = size_fn
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, self._entries[key]
+        return False, None
+
+    def _store(self, key, value, size):
+        # A value larger than the whole budget is handed back uncached instead of
+        # flushing every other entry.
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._total_bytes -= self._sizes[key]
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._sizes[key] = size
+        self._total_bytes += size
+        while self._total_bytes > self.max_bytes and self._entries:
+            old_key, _ = self._entries.popitem(last=False)
+            self._total_bytes -= self._sizes.pop(old_key)
+            self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value for key, computing it once across concurrent sessions on a miss."""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+            pending = self._pending.get(key)
+            is_owner = pending is None
+            if is_owner:
+                pending = self._pending[key] = _PendingResult()
+                self.misses += 1
+
+        if not is_owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            with self._lock:
+                self.hits += 1
+            return pending.value
+
+        try:
+            value = compute()
+            size = self.size_fn(value)
+        except BaseException as exc:
+            with self._lock:
+                del self._pending[key]
+            pending.error = exc
+            pending.done.set()
+            raise
+
+        # Store the value and retire the pending record together, so a session
+        # arriving in between cannot miss and start a second computation.
+        with self._lock:
+            self._store(key, value, size)
+            del self._pending[key]
+        pending.value = value
+        pending.done.set()
+        return value
+
+    def stats(self):
+        """Returns entry, memory, hit/miss and eviction counts."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,200 @@
+import threading
+import time
+
+import pytest
+
+from shared_cache import SharedReportCache
+
+
+def unit_size(value):
+    return 1
+
+
+def test_hit_after_miss():
+    cache = SharedReportCache(size_fn=unit_size)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "table"
+
+    assert cache.get_or_compute("k", compute) == "table"
+    assert cache.get_or_compute("k", compute) == "table"
+
+    stats = cache.stats()
+    assert len(calls) == 1
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+def test_lru_eviction_when_budget_exceeded():
+    cache = SharedReportCache(max_bytes=2, size_fn=unit_size)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    cache.get_or_compute("a", lambda: 1)  # "b" is now least recently used
+    cache.get_or_compute("c", lambda: 3)
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+    assert stats["bytes"] == 2
+    assert cache.get_or_compute("a", lambda: "recomputed") == 1
+    assert cache.get_or_compute("b", lambda: "recomputed") == "recomputed"
+
+
+def test_oversized_value_is_not_cached():
+    cache = SharedReportCache(max_bytes=5, size_fn=lambda value: value)
+    cache.get_or_compute("small", lambda: 3)
+
+    assert cache.get_or_compute("big", lambda: 10) == 10
+
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["evictions"] == 0
+
+
+def test_concurrent_requests_compute_once():
+    cache = SharedReportCache(size_fn=unit_size)
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return "frame"
+
+    def worker():
+        results.append(cache.get_or_compute("k", compute))
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert len(calls) == 1
+    assert results == ["frame"] * 16
+    assert stats["misses"] == 1
+    assert stats["hits"] == 15
+
+
+def test_request_arriving_before_store_does_not_recompute():
+    calls = []
+    late_results = []
+
+    def late_request():
+        late_results.append(cache.get_or_compute("k", lambda: calls.append("late") or "late"))
+
+    def size_fn(value):
+        # Runs after compute() but before the value is stored: a second session
+        # arriving now must wait for this result rather than compute its own.
+        late = threading.Thread(target=late_request)
+        late.start()
+        late.join(timeout=0.1)
+        size_fn.late = late
+        return 1
+
+    cache = SharedReportCache(size_fn=size_fn)
+    assert cache.get_or_compute("k", lambda: calls.append("first") or "first") == "first"
+    size_fn.late.join()
+
+    assert calls == ["first"]
+    assert late_results == ["first"]
+    assert cache.stats()["misses"] == 1
+
+
+def test_waiters_share_failure_and_next_arrival_computes_once():
+    cache = SharedReportCache(size_fn=lambda value: 4)
+    calls = []
+    outcomes = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        calls.append("failing")
+        started.set()
+        release.wait()
+        raise ValueError("transient")
+
+    def succeeding():
+        calls.append("succeeding")
+        return "table"
+
+    def request(compute):
+        try:
+            outcomes.append(cache.get_or_compute("k", compute))
+        except ValueError:
+            outcomes.append("error")
+
+    owner = threading.Thread(target=request, args=(failing,))
+    owner.start()
+    started.wait()
+    waiters = [threading.Thread(target=request, args=(succeeding,)) for _ in range(4)]
+    for waiter in waiters:
+        waiter.start()
+    time.sleep(0.05)
+    release.set()
+    owner.join()
+    for waiter in waiters:
+        waiter.join()
+
+    late = threading.Thread(target=request, args=(succeeding,))
+    late.start()
+    late.join()
+
+    stats = cache.stats()
+    assert calls == ["failing", "succeeding"]
+    assert outcomes == ["error"] * 5 + ["table"]
+    assert stats["entries"] == 1
+    assert stats["bytes"] == 4
+
+
+def test_concurrent_requests_for_oversized_value_compute_once():
+    cache = SharedReportCache(max_bytes=5, size_fn=lambda value: 10)
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return "huge frame"
+
+    def worker():
+        results.append(cache.get_or_compute("k", compute))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert len(calls) == 1
+    assert results == ["huge frame"] * 8
+    assert stats["entries"] == 0
+    assert stats["bytes"] == 0
+
+
+def test_storing_existing_key_replaces_its_size():
+    cache = SharedReportCache(max_bytes=10, size_fn=lambda value: value)
+    with cache._lock:
+        cache._store("k", 4, 4)
+        cache._store("k", 6, 6)
+
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["bytes"] == 6
+
+
+def test_retry_after_compute_raises():
+    cache = SharedReportCache(size_fn=unit_size)
+
+    def failing():
+        raise ValueError("bad extract")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute("k", failing)
+
+    assert cache.get_or_compute("k", lambda: "ok") == "ok"
+    assert cache.stats()["entries"] == 1